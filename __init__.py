@@ -3,6 +3,7 @@ from ctypes import wintypes
 from collections import namedtuple
 import numpy as np
 from getmonitorresolution import get_monitors_resolution
+from .perceptualhash import PerceptualHashIndex, dhash, ahash
 
 windll = ctypes.LibraryLoader(ctypes.WinDLL)
 windll.shcore.SetProcessDpiAwareness(2)
@@ -667,4 +668,7 @@ __all__ = [
     "ScreenshotOfOneMonitor",
     "ScreenshotOfAllMonitors",
     "ScreenshotOfWindow",
+    "PerceptualHashIndex",
+    "dhash",
+    "ahash",
 ]
@@ -0,0 +1,194 @@
+import numpy as np
+
+# ITU-R BT.601 luma weights in the B, G, R order returned by GetDIBits
+BGR_LUMA_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float64)
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(arr):
+        return _POPCOUNT_TABLE[arr.view(np.uint8)].reshape(*arr.shape, -1).sum(
+            axis=-1, dtype=np.uint8
+        )
+
+
+def _bin_starts(size, bins):
+    starts = np.linspace(0, size, bins + 1)[:-1].astype(np.intp)
+    if starts[-1] >= size or np.any(np.diff(starts) == 0):
+        raise ValueError(f"Image dimension {size} is too small for {bins} bins")
+    return starts
+
+
+def downsample_gray(img: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Downsample an image to a small grayscale grid by area averaging.
+
+    Args:
+        img (np.ndarray): A screenshot as returned by the capture classes (h, w, 3)
+            in BGR order, or a grayscale image (h, w).
+        width (int): The number of columns of the output grid.
+        height (int): The number of rows of the output grid.
+
+    Returns:
+        np.ndarray: The (height, width) grayscale grid as float64.
+
+    """
+    row_starts = _bin_starts(img.shape[0], height)
+    col_starts = _bin_starts(img.shape[1], width)
+    summed = np.add.reduceat(img, row_starts, axis=0, dtype=np.uint64)
+    summed = np.add.reduceat(summed, col_starts, axis=1, dtype=np.uint64)
+    row_counts = np.diff(np.append(row_starts, img.shape[0]))
+    col_counts = np.diff(np.append(col_starts, img.shape[1]))
+    counts = np.multiply.outer(row_counts, col_counts)
+    if summed.ndim == 3:
+        return (summed @ BGR_LUMA_WEIGHTS) / counts
+    return summed / counts
+
+
+def dhash(img: np.ndarray, hash_size: int = 8) -> np.ndarray:
+    """Compute the difference hash (dHash) of an image.
+
+    Args:
+        img (np.ndarray): A screenshot as returned by the capture classes.
+        hash_size (int, optional): The hash has hash_size * hash_size bits.
+            Defaults to 8.
+
+    Returns:
+        np.ndarray: The bit-packed hash as a 1-D uint8 array.
+
+    """
+    grid = downsample_gray(img, hash_size + 1, hash_size)
+    return np.packbits(grid[:, 1:] > grid[:, :-1])
+
+
+def ahash(img: np.ndarray, hash_size: int = 8) -> np.ndarray:
+    """Compute the average hash (aHash) of an image.
+
+    Args:
+        img (np.ndarray): A screenshot as returned by the capture classes.
+        hash_size (int, optional): The hash has hash_size * hash_size bits.
+            Defaults to 8.
+
+    Returns:
+        np.ndarray: The bit-packed hash as a 1-D uint8 array.
+
+    """
+    grid = downsample_gray(img, hash_size, hash_size)
+    return np.packbits(grid > grid.mean())
+
+
+hash_functions = {"dhash": dhash, "ahash": ahash}
+
+
+class PerceptualHashIndex:
+    def __init__(self, hash_size: int = 8, method: str = "dhash"):
+        """Array-backed index of perceptual hashes with Hamming-distance lookup.
+
+        Hashes are stored bit-packed in 64-bit words, so a query is one XOR and
+        one popcount per word over the whole index.
+
+        Args:
+            hash_size (int, optional): The hashes have hash_size * hash_size bits.
+                Defaults to 8.
+            method (str, optional): "dhash" or "ahash". Defaults to "dhash".
+
+        """
+        if method not in hash_functions:
+            raise ValueError(
+                f"Unknown method {method!r}, expected one of {list(hash_functions)}"
+            )
+        self.hash_size = hash_size
+        self.method = method
+        self.hash_function = hash_functions[method]
+        self.hash_bytes = (hash_size * hash_size + 7) // 8
+        self.hash_words = (self.hash_bytes + 7) // 8
+        self.hashes = np.zeros((1024, self.hash_words), dtype=np.uint64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _to_words(self, packed):
+        packed = np.asarray(packed, dtype=np.uint8).reshape(-1, self.hash_bytes)
+        padded = np.zeros((packed.shape[0], self.hash_words * 8), dtype=np.uint8)
+        padded[:, : self.hash_bytes] = packed
+        return padded.view(np.uint64)
+
+    def compute_hash(self, img: np.ndarray) -> np.ndarray:
+        """Return the bit-packed hash of an image (uint8 array)."""
+        return self.hash_function(img, self.hash_size)
+
+    def add_hash(self, packed: np.ndarray) -> int:
+        """Append a hash from compute_hash and return its position in the index."""
+        if self.size == self.hashes.shape[0]:
+            grown = np.zeros((self.size * 2, self.hash_words), dtype=np.uint64)
+            grown[: self.size] = self.hashes[: self.size]
+            self.hashes = grown
+        self.hashes[self.size] = self._to_words(packed)[0]
+        self.size += 1
+        return self.size - 1
+
+    def add(self, img: np.ndarray) -> int:
+        """Hash an image, append it and return its position in the index."""
+        return self.add_hash(self.compute_hash(img))
+
+    def distances_to_hash(self, packed: np.ndarray) -> np.ndarray:
+        """Return the Hamming distance from a hash to every stored hash."""
+        xored = self.hashes[: self.size] ^ self._to_words(packed)
+        return _popcount(xored).sum(axis=1, dtype=np.uint32)
+
+    def distances(self, img: np.ndarray) -> np.ndarray:
+        """Return the Hamming distance from an image to every stored hash."""
+        return self.distances_to_hash(self.compute_hash(img))
+
+    def nearest(self, img: np.ndarray, k: int = 1):
+        """Find the k stored hashes closest to an image.
+
+        Args:
+            img (np.ndarray): A screenshot as returned by the capture classes.
+            k (int, optional): The number of neighbours. Defaults to 1.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Positions in the index and their
+                Hamming distances, sorted by distance.
+
+        """
+        dists = self.distances(img)
+        k = min(k, self.size)
+        if k < self.size:
+            indices = np.argpartition(dists, k - 1)[:k]
+        else:
+            indices = np.arange(self.size)
+        indices = indices[np.argsort(dists[indices], kind="stable")]
+        return indices, dists[indices]
+
+    def within(self, img: np.ndarray, max_distance: int) -> np.ndarray:
+        """Return the positions of all stored hashes within max_distance of an image."""
+        return np.flatnonzero(self.distances(img) <= max_distance)
+
+    def seen(self, img: np.ndarray, max_distance: int = 0) -> bool:
+        """Return True if a hash within max_distance of the image is stored."""
+        return bool(self.size) and bool(self.distances(img).min() <= max_distance)
+
+    def save(self, path: str):
+        """Persist the index to a .npz file."""
+        np.savez(
+            path,
+            hashes=self.hashes[: self.size],
+            hash_size=self.hash_size,
+            method=self.method,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PerceptualHashIndex":
+        """Load an index written by save."""
+        with np.load(path) as data:
+            index = cls(hash_size=int(data["hash_size"]), method=str(data["method"]))
+            hashes = data["hashes"]
+        index.hashes = np.zeros(
+            (max(1024, hashes.shape[0]), index.hash_words), dtype=np.uint64
+        )
+        index.hashes[: hashes.shape[0]] = hashes
+        index.size = hashes.shape[0]
+        return index